@@ -324,15 +324,12 @@ class Instrument:
         # These list should all contain objects that is either a dataclass or implements `__eq__`.
         lists_attr = [name for name, val in vars(self).items() if isinstance(val, list)]
         for list_attr in lists_attr:
-            if len(getattr(self, list_attr)) != len(getattr(other, list_attr)):
-                return False
-            if any(
-                a1 != a2
-                for a1, a2 in zip(
-                    getattr(self, list_attr), getattr(other, list_attr), strict=False
-                )
-            ):
+            self_list, other_list = getattr(self, list_attr), getattr(other, list_attr)
+            if len(self_list) != len(other_list):
                 return False
+            for a1, a2 in zip(self_list, other_list, strict=False):
+                if a1 != a2:
+                    return False
 
         # All good, both tracks holds the exact same content
         return True
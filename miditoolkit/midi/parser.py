@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import collections
-import functools
+import heapq
 from collections.abc import Sequence
 from pathlib import Path
 
@@ -28,6 +28,22 @@ new_set = {"end", *mido.messages.SPEC_BY_TYPE["note_on"]["attribute_names"]}
 mido.messages.SPEC_BY_TYPE["note_on"]["attribute_names"] = new_set
 mido.messages.checks._CHECKS["end"] = mido.messages.checks.check_time
 
+# Order of the events of different types occurring at the same tick when writing a MIDI file.
+# Events of other types (e.g. track_name) are placed first.
+_EVENT_TYPE_ORDER = {
+    "set_tempo": 1,
+    "time_signature": 2,
+    "key_signature": 3,
+    "marker": 4,
+    "lyrics": 5,
+    "program_change": 6,
+    "pitchwheel": 7,
+    "control_change": 8,
+    "note_off": 9,
+    "note_on": 10,
+    "end_of_track": 11,
+}
+
 
 class MidiFile:
     def __init__(
@@ -178,6 +194,18 @@ class MidiFile:
         # This dict will map track indices to any track names encountered
         track_name_map = collections.defaultdict(str)
 
+        def __instrument_keys(program_: int, channel: int, track_: int):
+            """Packs the (channel, track) key of the stragglers and the
+            (program, channel, track) key of the instruments into single ints,
+            faster to hash than tuples. The program and channel respectively take
+            7 and 4 bits, the track index has no upper bound.
+            The pitch bend and control change branch below packs them inline,
+            any change here must be made there too.
+
+            """
+            straggler_key = (track_ << 4) | channel
+            return straggler_key, (straggler_key << 7) | program_
+
         def __get_instrument(
             program_: int,
             channel: int,
@@ -189,27 +217,28 @@ class MidiFile:
             instrument exists, one is created.
 
             """
+            straggler_key, instrument_key = __instrument_keys(program_, channel, track_)
             # If we have already created an instrument for this program
             # number/track/channel, return it
-            if (program_, channel, track_) in instrument_map:
-                return instrument_map[(program_, channel, track_)]
+            if instrument_key in instrument_map:
+                return instrument_map[instrument_key]
             # If there's a straggler instrument for this instrument and we
             # aren't being requested to create a new instrument
-            if not create_new and (channel, track_) in stragglers:
-                return stragglers[(channel, track_)]
+            if not create_new and straggler_key in stragglers:
+                return stragglers[straggler_key]
             is_drum = channel == 9
             # If we are told to, create a new instrument and store it
             if create_new:
                 instrument_ = Instrument(program_, is_drum, track_name_map[track_idx])
                 # If any events appeared for this instrument before now,
                 # include them in the new instrument
-                if (channel, track_) in stragglers:
-                    straggler = stragglers[(channel, track_)]
+                if straggler_key in stragglers:
+                    straggler = stragglers[straggler_key]
                     instrument_.control_changes = straggler.control_changes
                     instrument_.pitch_bends = straggler.pitch_bends
                     instrument_.pedals = straggler.pedals
                 # Add the instrument to the instrument map
-                instrument_map[(program_, channel, track_)] = instrument_
+                instrument_map[instrument_key] = instrument_
             # Otherwise, create a "straggler" instrument which holds events
             # which appear before we actually want to create a proper new
             # instrument
@@ -219,7 +248,7 @@ class MidiFile:
                 # Note that stragglers ignores program number, because we want
                 # to store all events on a track which appear before the first
                 # note-on, regardless of program
-                stragglers[(channel, track_)] = instrument_
+                stragglers[straggler_key] = instrument_
             return instrument_
 
         for track_idx, track in enumerate(midi_data.tracks):
@@ -228,7 +257,10 @@ class MidiFile:
             last_note_on = collections.defaultdict(list)
             # Keep track of which instrument is playing in each channel
             # initialize to program 0 for all channels
-            current_instrument = np.zeros(16, dtype=np.int8)
+            # (a bytearray is indexed as Python ints, not as numpy scalars)
+            current_instrument = bytearray(16)
+            # Track part of the instrument keys, as packed by __instrument_keys
+            track_shift = track_idx << 4
             for event in track:
                 # Look for track name events
                 if event.type == "track_name":
@@ -287,33 +319,33 @@ class MidiFile:
                         else:
                             # Remove the last note on for this instrument
                             del last_note_on[key]
-                # Store pitch bends
-                elif event.type == "pitchwheel":
-                    # Create pitch bend class instance
-                    bend = PitchBend(event.pitch, event.time)
+                # Store pitch bends and control changes
+                elif event.type == "pitchwheel" or event.type == "control_change":
                     # Get the program for the current inst
                     program = current_instrument[event.channel]
                     # Retrieve the Instrument instance for the current inst
                     # Don't create a new instrument if none exists
-                    instrument = __get_instrument(
-                        program, event.channel, track_idx, False
-                    )
-                    # Add the pitch bend event
-                    instrument.pitch_bends.append(bend)
-                # Store control changes
-                elif event.type == "control_change":
-                    control_change = ControlChange(
-                        event.control, event.value, event.time
-                    )
-                    # Get the program for the current inst
-                    program = current_instrument[event.channel]
-                    # Retrieve the Instrument instance for the current inst
-                    # Don't create a new instrument if none exists
-                    instrument = __get_instrument(
-                        program, event.channel, track_idx, False
-                    )
-                    # Add the control change event
-                    instrument.control_changes.append(control_change)
+                    # These are the most frequent events, the lookups of
+                    # __get_instrument, and its keys packing as in
+                    # __instrument_keys, are inlined to save function calls
+                    straggler_key = track_shift | event.channel
+                    instrument = instrument_map.get((straggler_key << 7) | program)
+                    if instrument is None:
+                        instrument = stragglers.get(straggler_key)
+                    if instrument is None:
+                        instrument = __get_instrument(
+                            program, event.channel, track_idx, False
+                        )
+                    if event.type == "pitchwheel":
+                        # Add the pitch bend event
+                        instrument.pitch_bends.append(
+                            PitchBend(event.pitch, event.time)
+                        )
+                    else:
+                        # Add the control change event
+                        instrument.control_changes.append(
+                            ControlChange(event.control, event.value, event.time)
+                        )
 
         # Initialize list of instruments from instrument_map
         instruments = [i for i in instrument_map.values()]
@@ -345,6 +377,23 @@ class MidiFile:
             self.ticks_per_beat, self.max_tick, self.tempo_changes
         )
 
+    def tick_to_time(
+        self, ticks: int | Sequence[int] | np.ndarray
+    ) -> float | np.ndarray:
+        r"""Converts ticks into seconds.
+
+        Unlike :meth:`get_tick_to_time_mapping`, which builds the times of all the ticks
+        up to ``max_tick``, this method only computes the times of the given ticks, by
+        binary searching the tempo changes.
+
+        Args:
+            ticks: tick, or sequence of ticks, to convert.
+
+        Returns: the time(s) in seconds of the ticks.
+
+        """
+        return _get_seconds_of_ticks(ticks, self.ticks_per_beat, self.tempo_changes)
+
     @property
     def num_instruments(self) -> int:
         return len(self.instruments)
@@ -375,15 +424,12 @@ class MidiFile:
         # These list should all contain objects that is either a dataclass or implements `__eq__`.
         lists_attr = [name for name, val in vars(self).items() if isinstance(val, list)]
         for list_attr in lists_attr:
-            if len(getattr(self, list_attr)) != len(getattr(other, list_attr)):
-                return False
-            if any(
-                a1 != a2
-                for a1, a2 in zip(
-                    getattr(self, list_attr), getattr(other, list_attr), strict=False
-                )
-            ):
+            self_list, other_list = getattr(self, list_attr), getattr(other, list_attr)
+            if len(self_list) != len(other_list):
                 return False
+            for a1, a2 in zip(self_list, other_list, strict=False):
+                if a1 != a2:
+                    return False
 
         # All good, both MIDIs holds the exact same content
         return True
@@ -397,40 +443,6 @@ class MidiFile:
         instrument_idx: int | None = None,
         charset: str = "latin1",
     ):
-        # comparison function
-        def event_compare(event1, event2):
-            if event1.time != event2.time:
-                return event1.time - event2.time
-
-            # If its two note_on (at the same tick), sort by expected note_off in a FIFO logic
-            # This is required in case where the MIDI has notes starting at the same tick and one
-            # with a higher duration is listed before one with a shorter one. In this case, the note
-            # with the higher duration should come after, otherwise it will be ended first by the
-            # following note_off event. Ultimately, as the notes have the same starting time and pitch,
-            # the only thing that could be missed is their velocities. This check prevents this.
-            if event1.type == event2.type == "note_on":
-                return event1.end - event2.end
-
-            secondary_sort = {
-                "set_tempo": 1,
-                "time_signature": 2,
-                "key_signature": 3,
-                "marker": 4,
-                "lyrics": 5,
-                "program_change": 6,
-                "pitchwheel": 7,
-                "control_change": 8,
-                "note_off": 9,
-                "note_on": 10,
-                "end_of_track": 11,
-            }
-
-            if event1.type in secondary_sort and event2.type in secondary_sort:
-                return secondary_sort[event1.type] - secondary_sort[event2.type]
-
-            # Events have the same order / position, no change between position
-            return 0
-
         if (filename is None) and (file is None):
             raise OSError("please specify the output.")
 
@@ -449,12 +461,10 @@ class MidiFile:
         # Create track 0 with timing information
 
         # 1. Time signature
-        # add default
-        add_ts = True
+        # add default, if there is no time signature at tick 0
+        # the changes are usually sorted by time, so all() stops at the first one
         ts_list = []
-        if self.time_signature_changes:
-            add_ts = min([ts.time for ts in self.time_signature_changes]) > 0
-        if add_ts:
+        if all(ts.time > 0 for ts in self.time_signature_changes):
             ts_list.append(
                 mido.MetaMessage("time_signature", time=0, numerator=4, denominator=4)
             )
@@ -471,12 +481,9 @@ class MidiFile:
             )
 
         # 2. Tempo
-        # - add default
-        add_t = True
+        # - add default, if there is no tempo change at tick 0
         tempo_list = []
-        if self.tempo_changes:
-            add_t = min([t.time for t in self.tempo_changes]) > 0.0
-        if add_t:
+        if all(t.time > 0.0 for t in self.tempo_changes):
             tempo_list.append(
                 mido.MetaMessage("set_tempo", time=0, tempo=mido.bpm2tempo(DEFAULT_BPM))
             )
@@ -529,16 +536,11 @@ class MidiFile:
             key_list = _include_meta_events_within_tick_range(
                 key_list, start_tick, end_tick, shift=shift, front=True
             )
-        meta_track = ts_list + tempo_list + lyrics_list + markers_list + key_list
-
-        # sort
-        meta_track.sort(key=functools.cmp_to_key(event_compare))
-
-        # end of meta track
-        meta_track.append(
-            mido.MetaMessage("end_of_track", time=meta_track[-1].time + 1)
+        # merge the sorted lists, and add the meta track with delta times
+        meta_track = _merge_sorted_events(
+            ts_list, tempo_list, lyrics_list, markers_list, key_list
         )
-        midi_parsed.tracks.append(meta_track)
+        midi_parsed.tracks.append(_to_delta_time_track(meta_track))
 
         # -- instruments -- #
         channels = list(range(16))
@@ -627,15 +629,15 @@ class MidiFile:
                 bend_list = _include_meta_events_within_tick_range(
                     bend_list, start_tick, end_tick, shift=shift, front=True
                 )
-            track += bend_list + cc_list
 
             # Add all note events
+            note_on_list, note_off_list = [], []
             for note in instrument.notes:
                 if segment and not _is_note_within_tick_range(
                     note, start_tick, end_tick, shift, True
                 ):
                     continue
-                track.append(
+                note_on_list.append(
                     mido.Message(
                         "note_on",
                         time=note.start,
@@ -646,7 +648,7 @@ class MidiFile:
                     )
                 )
                 # Also need a note-off event
-                track.append(
+                note_off_list.append(
                     mido.Message(
                         "note_off",
                         time=note.end,
@@ -655,19 +657,12 @@ class MidiFile:
                         velocity=note.velocity,
                     )
                 )
-            track = sorted(track, key=functools.cmp_to_key(event_compare))
-
-            # Finally, add in an end of track event
-            track.append(mido.MetaMessage("end_of_track", time=track[-1].time + 1))
-            # Add to the list of output tracks
-            midi_parsed.tracks.append(track)
+            track = _merge_sorted_events(
+                track, bend_list, cc_list, note_on_list, note_off_list
+            )
 
-        # Cumulative timing to delta
-        for track in midi_parsed.tracks:
-            tick = 0
-            for event in track:
-                event.time -= tick
-                tick += event.time
+            # Add to the list of output tracks, with delta times
+            midi_parsed.tracks.append(_to_delta_time_track(track))
 
         # Write it out
         if filename:
@@ -676,6 +671,73 @@ class MidiFile:
             midi_parsed.save(file=file)
 
 
+def _event_sort_key(event: mido.MetaMessage | mido.Message) -> tuple[int, int, int]:
+    r"""Returns the key to sort the events of a track before writing it.
+
+    The events are sorted by time, then by type (following ``_EVENT_TYPE_ORDER``).
+    Two note_on events at the same tick are sorted by their expected note_off time, in
+    a FIFO logic. This is required in case where the MIDI has notes starting at the same
+    tick and one with a higher duration is listed before one with a shorter one. In this
+    case, the note with the higher duration should come after, otherwise it will be ended
+    first by the following note_off event. Ultimately, as the notes have the same starting
+    time and pitch, the only thing that could be missed is their velocities.
+    The key is computed once per event by ``list.sort``, unlike a comparison function.
+
+    Args:
+        event: event to sort.
+
+    Returns: the sort key of the event.
+
+    """
+    if event.type == "note_on":
+        return event.time, _EVENT_TYPE_ORDER["note_on"], event.end
+    return event.time, _EVENT_TYPE_ORDER.get(event.type, 0), 0
+
+
+def _merge_sorted_events(
+    *event_lists: list[mido.MetaMessage | mido.Message],
+) -> list[mido.MetaMessage | mido.Message]:
+    r"""Merges lists of events into a single list sorted with ``_event_sort_key``.
+
+    Each list is sorted (inplace) first, which is linear when it is already sorted by
+    time, as the lists built from the ``MidiFile`` attributes usually are. The lists are
+    then merged in O(n log k) instead of sorting their concatenation. Events with equal
+    keys keep the order of the lists, as with a stable sort of the concatenation.
+
+    Args:
+        event_lists: lists of events to merge.
+
+    Returns: the merged list of events.
+
+    """
+    for events in event_lists:
+        events.sort(key=_event_sort_key)
+    return list(heapq.merge(*event_lists, key=_event_sort_key))
+
+
+def _to_delta_time_track(
+    events: Sequence[mido.MetaMessage | mido.Message],
+) -> mido.MidiTrack:
+    r"""Creates a track from a sorted sequence of events with cumulative times.
+
+    The times of the events are converted (inplace) to delta times while filling the
+    track, and an end of track event is added one tick after the last event.
+
+    Args:
+        events: sorted events, with cumulative times in ticks.
+
+    Returns: the track, with delta times.
+
+    """
+    track = mido.MidiTrack()
+    tick = 0
+    for event in events:
+        event.time, tick = event.time - tick, event.time
+        track.append(event)
+    track.append(mido.MetaMessage("end_of_track", time=1))
+    return track
+
+
 def _is_note_within_tick_range(
     note: Note,
     start_tick: int,
@@ -769,6 +831,36 @@ def _get_tick_eq_of_second(sec: float | int, tick_to_time: np.ndarray) -> int:
     return int((np.abs(tick_to_time - sec)).argmin())
 
 
+def _get_seconds_of_ticks(
+    ticks: int | Sequence[int] | np.ndarray,
+    ticks_per_beat: int,
+    tempo_changes: Sequence[TempoChange],
+) -> float | np.ndarray:
+    ticks = np.asarray(ticks)
+    if len(tempo_changes) == 0:
+        return np.zeros(ticks.shape) if ticks.ndim else 0.0
+
+    # seconds per tick of each tempo, sorted by time as the tempo changes are not
+    # sorted on load, and time of each tempo change in seconds
+    tempo_ticks = np.array([tempo.time for tempo in tempo_changes], dtype=np.int64)
+    seconds_per_tick = (
+        60 / np.array([tempo.tempo for tempo in tempo_changes], dtype=np.float64)
+    ) / float(ticks_per_beat)
+    order = np.argsort(tempo_ticks, kind="stable")
+    tempo_ticks, seconds_per_tick = tempo_ticks[order], seconds_per_tick[order]
+    tempo_seconds = np.zeros(len(tempo_changes))
+    np.cumsum(np.diff(tempo_ticks) * seconds_per_tick[:-1], out=tempo_seconds[1:])
+
+    # ticks before the first tempo change are mapped to 0, as in the full mapping
+    idx = np.searchsorted(tempo_ticks, ticks, side="right") - 1
+    seconds = np.where(
+        idx >= 0,
+        tempo_seconds[idx] + (ticks - tempo_ticks[idx]) * seconds_per_tick[idx],
+        0.0,
+    )
+    return seconds if seconds.ndim else float(seconds)
+
+
 def _get_tick_to_second_mapping(
     ticks_per_beat: int, max_tick: int, tempo_changes: Sequence[TempoChange]
 ) -> np.ndarray:
@@ -1,8 +1,9 @@
-from .parser import notes2pianoroll, pianoroll2notes
+from .parser import notes2pianoroll, notes2pianoroll_batch, pianoroll2notes
 
 # Convenience re-exports
 
 __all__ = [
     "notes2pianoroll",
+    "notes2pianoroll_batch",
     "pianoroll2notes",
 ]
@@ -1,13 +1,38 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-from copy import deepcopy
+import math
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING
 
 import numpy as np
 
 from miditoolkit import Note
 from miditoolkit.constants import PITCH_RANGE
 
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+_NOTE_DTYPE = np.dtype(
+    [
+        ("start", np.int64),
+        ("end", np.int64),
+        ("pitch", np.int64),
+        ("velocity", np.int64),
+    ]
+)
+
+# numpy equivalents of the usual resampling methods, np.rint rounds half to even as
+# the round builtin
+_RESAMPLE_METHODS = {
+    round: np.rint,
+    math.floor: np.floor,
+    math.ceil: np.ceil,
+    int: np.trunc,
+}
+
 
 def notes2pianoroll(
     notes: list[Note],
@@ -18,7 +43,8 @@ def notes2pianoroll(
     velocity_threshold: int = 0,
     time_portion: tuple[int, int] | None = None,
     keep_note_with_zero_duration: bool = True,
-) -> np.ndarray:
+    sparse: bool = False,
+) -> np.ndarray | csr_matrix:
     r"""Converts a sequence of notes into a pianoroll numpy array.
 
     Args:
@@ -33,8 +59,16 @@ def notes2pianoroll(
         time_portion: time portion in tick to represent. (default: None)
         keep_note_with_zero_duration: option to keep the notes with a duration of 0 ticks, by
             representing them with a duration of 1 tick.
+        sparse: returns the pianoroll as a scipy sparse (CSR) matrix, which is only
+            allocated for the time steps covered by notes. This requires scipy to be
+            installed. (default: False)
 
     Returns: the pianoroll as a numpy array of two dimensions: the first is the time, the second is the pitch.
+        The dense array is a transposed view of a (pitch, time) array, i.e. it is
+        F-ordered and not C-contiguous: reshaping it, slicing it per frame or calling
+        ``tobytes`` on it may copy, and ``tochroma`` always copies it. Use
+        ``np.ascontiguousarray`` if a C layout is needed.
+        If ``sparse`` is True, it is a scipy CSR matrix of the same shape instead.
 
     """
     # Checks
@@ -46,16 +80,30 @@ def notes2pianoroll(
         0 <= pitch_offset < 127
     ), "The pitch offset must be comprised between 0 and 126 (included)."
 
-    # Copy and sort the notes
-    note_stream = deepcopy(notes)
-    note_stream.sort(key=lambda x: (x.end, x.start, x.velocity))
+    # Extract the note attributes as one array per attribute, all the computations
+    # are then made on these arrays: the notes are never copied nor modified.
+    # They are read as records, fromiter only supports subarray dtypes from numpy 1.23
+    attributes = (
+        np.fromiter(
+            ((note.start, note.end, note.pitch, note.velocity) for note in notes),
+            dtype=_NOTE_DTYPE,
+            count=len(notes),
+        )
+        .view(np.int64)
+        .reshape(-1, 4)
+        .T
+    )
+    # Sort the notes by end, start and velocity, the ones written last overwrite the
+    # previous ones (lexsort is stable, ties keep their order as with sorted)
+    order = np.lexsort((attributes[3], attributes[0], attributes[1]))
+    starts, ends, pitches, velocities = attributes[:, order]
 
     # Set start and end tick
     if time_portion is not None:
         start_tick, max_tick = time_portion
     else:
         start_tick = 0
-        max_tick = note_stream[-1].end
+        max_tick = int(ends[-1])
 
     # Pitch range detection
     def_low_pitch, def_high_pitch = PITCH_RANGE
@@ -69,57 +117,262 @@ def notes2pianoroll(
     # Resampling time
     if resample_factor is not None:
         max_tick = int(resample_method(max_tick * resample_factor))
-        for note in note_stream:
-            note.start = int(resample_method(note.start * resample_factor))
-            note.end = int(resample_method(note.end * resample_factor))
+        starts = _resample_ticks(starts, resample_factor, resample_method)
+        ends = _resample_ticks(ends, resample_factor, resample_method)
+
+    # Discarding notes having velocity under the threshold
+    # Or outside the tick portion, or the pitch range
+    keep = (velocities >= velocity_threshold) & (ends >= start_tick)
+    keep &= starts <= max_tick
+    if pitch_range is not None:
+        keep &= (pitches >= pitch_range[0]) & (pitches <= pitch_range[1])
+    starts, ends = starts[keep], ends[keep]
+    pitches, velocities = pitches[keep], velocities[keep]
+
+    # Adjust notes times if needed
+    np.maximum(starts, start_tick, out=starts)
+    np.minimum(ends, max_tick, out=ends)
+
+    # keep notes with zero length (set to 1), within the tick portion
+    if keep_note_with_zero_duration:
+        ends[starts == ends] += 1
+        np.minimum(ends, max_tick, out=ends)
+
+    # Shift the notes so that the pianoroll directly starts at the start tick
+    first_tick = max(start_tick, 0)
+    starts -= first_tick
+    ends -= first_tick
+    num_ticks = max(max_tick - first_tick, 0)
+
+    # Check the pitches fit in the pianoroll, the numba kernel does not check bounds
+    if pitches.size > 0 and (pitches.min() < 0 or pitches.max() > high_pitch):
+        invalid = pitches[(pitches < 0) | (pitches > high_pitch)][0]
+        raise IndexError(
+            f"Note pitch {invalid} is out of bounds for a pianoroll with pitches from "
+            f"0 to {high_pitch}."
+        )
 
     # Create pianoroll
-    pianoroll = np.zeros(shape=(max_tick, high_pitch + 1), dtype=np.int8)
-    for note in note_stream:
-        # Discarding notes having velocity under the threshold
-        # Or outside the tick portion, or the pitch range
-        if note.velocity < velocity_threshold:
-            continue
-        if note.end < start_tick:
-            continue
-        if note.start > max_tick:
-            break
-        if pitch_range is not None and (
-            note.pitch < pitch_range[0] or note.pitch > pitch_range[1]
-        ):
-            continue
-
-        # Adjust notes times if needed
-        if note.start < start_tick:
-            note.start = start_tick
-        if note.end > max_tick:
-            note.end = max_tick
-
-        # keep notes with zero length (set to 1)
-        if keep_note_with_zero_duration and note.start == note.end:
-            note.end += 1
-
-        # set array value
-        indices = (
-            list(range(note.start, note.end)),
-            [note.pitch] * (note.end - note.start),
+    if sparse:
+        pianoroll = _sparse_pianoroll(
+            (num_ticks, high_pitch + 1), starts, ends, pitches, velocities
         )
-        pianoroll[indices] = note.velocity
+    else:
+        # Allocated pitch-major so that each note is written contiguously, the
+        # returned (time, pitch) array is a transposed view of it
+        pianoroll = np.zeros(shape=(high_pitch + 1, num_ticks), dtype=np.int8)
+        _paint_pianoroll(pianoroll, starts, ends, pitches, velocities)
+        pianoroll = pianoroll.T
 
-    # Cut the array if needed on its two dimensions (time, pitch)
-    if start_tick > 0:
-        pianoroll = pianoroll[start_tick:]
+    # Cut the array if needed on the pitch dimension
     if pitch_range is None:
-        # Automatically cut the lowest and highest
-        pitch_played = np.where(np.any(pianoroll != 0, axis=0) == 1)[0]
-        low_pitch = max(def_low_pitch, pitch_played[0] - pitch_offset)
-        high_pitch = min(def_high_pitch, pitch_played[-1] - def_high_pitch)
+        # Automatically cut the lowest and highest, if any note is played
+        if sparse:
+            pitch_played = np.flatnonzero(pianoroll.getnnz(axis=0))
+        else:
+            pitch_played = np.flatnonzero(pianoroll.any(axis=0))
+        if pitch_played.size > 0:
+            low_pitch = max(def_low_pitch, pitch_played[0] - pitch_offset)
+            high_pitch = min(def_high_pitch, pitch_played[-1] + pitch_offset)
     if low_pitch != def_low_pitch or high_pitch != def_high_pitch:
         pianoroll = pianoroll[:, low_pitch : high_pitch + 1]
 
     return pianoroll
 
 
+def notes2pianoroll_batch(
+    notes_batch: Sequence[list[Note]],
+    n_jobs: int | None = None,
+    **kwargs,
+) -> list[np.ndarray | csr_matrix]:
+    r"""Converts several sequences of notes into pianorolls, in parallel processes.
+
+    This is intended for many independent tracks or files, e.g. when preprocessing a
+    dataset. The notes and pianorolls are pickled to be sent between processes, a
+    single sequence of notes is faster to convert in-process with
+    :func:`notes2pianoroll`.
+
+    Args:
+        notes_batch: sequences of notes to convert.
+        n_jobs: number of processes to use. If not given, or lower than 1 (e.g. -1),
+            the number of CPUs of the machine is used. (default: None)
+        **kwargs: keyword arguments given to :func:`notes2pianoroll`.
+
+    Returns: the pianorolls, in the same order as the sequences of notes.
+
+    """
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    chunksize = max(1, len(notes_batch) // (4 * n_jobs))
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(
+            executor.map(
+                partial(notes2pianoroll, **kwargs), notes_batch, chunksize=chunksize
+            )
+        )
+
+
+def _resample_ticks(
+    ticks: np.ndarray, resample_factor: float, resample_method: Callable
+) -> np.ndarray:
+    r"""Resamples ticks, with numpy if the method has an equivalent.
+
+    Args:
+        ticks: ticks to resample.
+        resample_factor: factor to resample the ticks.
+        resample_method: resampling method.
+
+    Returns: the resampled ticks.
+
+    """
+    ticks = ticks * resample_factor
+    if resample_method in _RESAMPLE_METHODS:
+        return _RESAMPLE_METHODS[resample_method](ticks).astype(np.int64)
+    return np.array(
+        [int(resample_method(tick)) for tick in ticks.tolist()], dtype=np.int64
+    )
+
+
+def _paint_pianoroll(
+    pianoroll: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pitches: np.ndarray,
+    velocities: np.ndarray,
+) -> None:
+    r"""Writes (inplace) notes in a pianoroll.
+
+    The notes are written in order: positions covered by several notes take the
+    velocity of the last one. If numba is installed, they are written by a compiled
+    kernel. Otherwise, each note is written as a slice of its pitch row.
+
+    Args:
+        pianoroll: pianoroll to write the notes in, of shape (pitch, time).
+        starts: start ticks of the notes.
+        ends: end ticks of the notes (excluded).
+        pitches: pitches of the notes.
+        velocities: velocities of the notes.
+
+    """
+    paint_notes = _paint_notes_kernel()
+    if paint_notes is not None:
+        paint_notes(pianoroll, starts, ends, pitches, velocities)
+        return
+
+    # Iterating over lists of Python ints, faster than over numpy scalars
+    for start, end, pitch, velocity in zip(
+        starts.tolist(),
+        ends.tolist(),
+        pitches.tolist(),
+        velocities.tolist(),
+        strict=False,
+    ):
+        pianoroll[pitch, start:end] = velocity
+
+
+def _sparse_pianoroll(
+    shape: tuple[int, int],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pitches: np.ndarray,
+    velocities: np.ndarray,
+) -> csr_matrix:
+    r"""Creates a sparse pianoroll from notes.
+
+    The positions covered by several notes take the velocity of the last one, as
+    with :func:`_paint_pianoroll`.
+
+    Args:
+        shape: shape of the pianoroll, (time, pitch).
+        starts: start ticks of the notes.
+        ends: end ticks of the notes (excluded).
+        pitches: pitches of the notes.
+        velocities: velocities of the notes.
+
+    Returns: the pianoroll as a CSR matrix.
+
+    """
+    try:
+        from scipy.sparse import coo_matrix
+    except ImportError as error:
+        raise ImportError(
+            "scipy is required to create sparse pianorolls, you can install it with "
+            "`pip install scipy`"
+        ) from error
+
+    ticks, pitches, velocities = _note_cells(starts, ends, pitches, velocities)
+    # Only keep the last write of each position, as duplicates would be summed
+    last = _last_occurrences(ticks * shape[1] + pitches)
+    pianoroll = coo_matrix(
+        (velocities[last].astype(np.int8), (ticks[last], pitches[last])),
+        shape=shape,
+    ).tocsr()
+    pianoroll.eliminate_zeros()  # notes with a velocity of 0
+    return pianoroll
+
+
+def _last_occurrences(indices: np.ndarray) -> np.ndarray:
+    r"""Finds the last occurrence of each distinct index.
+
+    Args:
+        indices: indices, possibly repeated.
+
+    Returns: the positions in ``indices`` of the last occurrence of each distinct
+        index, in increasing order of the indices.
+
+    """
+    _, last = np.unique(indices[::-1], return_index=True)
+    return len(indices) - 1 - last
+
+
+def _note_cells(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    pitches: np.ndarray,
+    velocities: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    r"""Enumerates the (tick, pitch, velocity) cells covered by notes.
+
+    Args:
+        starts: start ticks of the notes.
+        ends: end ticks of the notes (excluded).
+        pitches: pitches of the notes.
+        velocities: velocities of the notes.
+
+    Returns: the ticks, pitches and velocities of all the time steps of all the notes,
+        in the order of the notes.
+
+    """
+    durations = np.maximum(ends - starts, 0)
+    offsets = np.cumsum(durations) - durations
+    ticks = np.arange(durations.sum()) + np.repeat(starts - offsets, durations)
+    return ticks, np.repeat(pitches, durations), np.repeat(velocities, durations)
+
+
+@lru_cache
+def _paint_notes_kernel() -> Callable | None:
+    r"""Compiles the numba kernel writing notes in a pianoroll, in order.
+
+    The kernel runs in the calling thread: it starts no thread pool, so that the
+    process can still be forked safely afterward. numba is imported on the first call
+    rather than with the module, as it is slow to import.
+
+    Returns: the kernel, or None if numba is not installed.
+
+    """
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional, used to compile the pianoroll painting
+        return None
+
+    @njit(cache=True)
+    def paint_notes(pianoroll, starts, ends, pitches, velocities):
+        for i in range(len(starts)):
+            pianoroll[pitches[i], starts[i] : ends[i]] = velocities[i]
+
+    return paint_notes
+
+
 def pianoroll2notes(
     pianoroll: np.ndarray,
     resample_factor: float | None = None,
@@ -137,50 +390,47 @@ def pianoroll2notes(
 
     """
     # Handles pitch range
-    # Pads the pianoroll array so that the pitch dimension size is PITCH_RANGE[1] (128)
+    # The first column of the pianoroll is the lowest pitch of the range, the pitches
+    # of the notes are offset accordingly (instead of padding the pianoroll)
     if isinstance(pitch_range, int):
         low_pitch = pitch_range
-        high_pitch = low_pitch + pianoroll.shape[1]
     elif isinstance(pitch_range, tuple):
-        low_pitch, high_pitch = pitch_range
+        low_pitch = pitch_range[0]
     else:
         low_pitch = PITCH_RANGE[0]
-        high_pitch = low_pitch + pianoroll.shape[1]
-    arrays = []
-    if low_pitch != PITCH_RANGE[0]:
-        arrays.append(np.zeros((pianoroll.shape[0], low_pitch), dtype=pianoroll.dtype))
-    arrays.append(pianoroll)
-    if high_pitch != PITCH_RANGE[1]:
-        arrays.append(
-            np.zeros(
-                (pianoroll.shape[0], PITCH_RANGE[1] - high_pitch), dtype=pianoroll.dtype
-            )
-        )
-    if len(arrays) > 1:
-        pianoroll = np.concatenate(arrays, axis=1)
 
     # pad with zeros for the first and last events
     padded = np.pad(pianoroll > 0, ((1, 1), (0, 0)), "constant")
-    diff = np.diff(padded.astype(np.int8), axis=0)
-
-    pitches, note_ons = np.nonzero((diff > 0).T)
-    note_offs = np.nonzero((diff < 0).T)[1]
-
-    notes = []
-    for idx, pitch in enumerate(pitches):
-        st = note_ons[idx]
-        ed = note_offs[idx]
-        velocity = int(pianoroll[st, pitch])
-        velocity = max(0, min(127, velocity))
-        if resample_factor is not None:
-            st, ed = int(st * resample_factor), int(ed * resample_factor)
-        notes.append(
-            Note(
-                velocity=int(velocity),
-                pitch=pitch,
-                start=st,
-                end=ed,
-            )
+    # the activity changes between two ticks are note ons if the next tick is
+    # active, or note offs otherwise (computed on booleans, without int cast)
+    edges = padded[1:] ^ padded[:-1]
+
+    # (tick, pitch) positions of the note ons and offs, sorted by pitch then tick so
+    # that they are paired, without transposing the edges array
+    ons = np.argwhere(edges & padded[1:])
+    offs = np.argwhere(edges & padded[:-1])
+    ons = ons[np.lexsort((ons[:, 0], ons[:, 1]))]
+    offs = offs[np.lexsort((offs[:, 0], offs[:, 1]))]
+    note_ons, pitches = ons[:, 0], ons[:, 1]
+    note_offs = offs[:, 0]
+
+    # Gather the velocities and resample the times of all the notes at once
+    velocities = np.clip(pianoroll[note_ons, pitches].astype(np.int64), 0, 127)
+    pitches = pitches + low_pitch
+    if resample_factor is not None:
+        note_ons = (note_ons * resample_factor).astype(np.int64)
+        note_offs = (note_offs * resample_factor).astype(np.int64)
+
+    # Sort the notes by start time (and pitch), then create them
+    # tolist() converts the values to Python ints, faster to iterate than numpy scalars
+    order = np.lexsort((pitches, note_ons))
+    return [
+        Note(velocity=velocity, pitch=pitch, start=start, end=end)
+        for velocity, pitch, start, end in zip(
+            velocities[order].tolist(),
+            pitches[order].tolist(),
+            note_ons[order].tolist(),
+            note_offs[order].tolist(),
+            strict=False,
         )
-    notes.sort(key=lambda x: x.start)
-    return notes
+    ]
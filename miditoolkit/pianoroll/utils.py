@@ -6,10 +6,12 @@ def downsample(pianoroll, ori_resol, factor):
 
 
 def tochroma(pianoroll):
-    chroma = np.zeros((pianoroll.shape[0], 12))
-    for note in range(12):
-        chroma[:, note] = np.sum(pianoroll[:, note::12], axis=1)
-    return chroma
+    # pad the pitches to complete octaves, then sum the octaves of each pitch class
+    # in a (time, octave, pitch class) view
+    pad = -pianoroll.shape[1] % 12
+    if pad:
+        pianoroll = np.pad(pianoroll, ((0, 0), (0, pad)))
+    return pianoroll.reshape(pianoroll.shape[0], -1, 12).sum(axis=1, dtype=np.float64)
 
 
 def pitch_padding(pianoroll, pitch_range, padding_range=(0, 127), value=0):
@@ -25,5 +27,14 @@ def pitch_padding(pianoroll, pitch_range, padding_range=(0, 127), value=0):
 
 
 def normalize(tensor):
-    res = (tensor - np.min(tensor)) / (np.max(tensor) - np.min(tensor))
+    # float32 for narrow inputs such as int8 pianorolls, float64 is kept for float64 ones
+    res = np.empty(tensor.shape, dtype=np.result_type(tensor, np.float32))
+    t_min, t_max = np.min(tensor), np.max(tensor)
+    if t_max == t_min:
+        # constant tensor, avoid dividing by zero
+        res.fill(0)
+        return res
+    # computed in the output dtype, to not overflow with integer inputs
+    np.subtract(tensor, t_min, out=res, dtype=res.dtype)
+    res /= np.subtract(t_max, t_min, dtype=res.dtype)
     return res
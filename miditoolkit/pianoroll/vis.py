@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 import numpy as np
-from matplotlib import pyplot as plt
+from matplotlib import colormaps
+from matplotlib.colors import Colormap
+from matplotlib.ticker import FixedLocator, FuncFormatter, NullFormatter
 
 from ..constants import PITCH_ID_TO_NAME
 from .utils import pitch_padding
 
+if TYPE_CHECKING:
+    from matplotlib import pyplot as plt
+
 # -------------------------------------------- #
 # Global and Customized Parameters
 # -------------------------------------------- #
@@ -17,8 +25,11 @@ SM_CMAP = "gray"
 PR_CMAP = "gray"
 
 # colors
+NOTE_COLOR_SHIFT = 80  # for better color percetion
 WHITE_KEY_SATUR = 0.96
 BLACK_KEY_SATUR = 0.78
+# pitches of the black keys, from C#-1 (1) to F#9 (126)
+BLACK_KEY_IDX = np.flatnonzero(np.isin(np.arange(128) % 12, [1, 3, 6, 8, 10]))
 
 # font size
 XLABEL_FONT_SIZE = 2
@@ -47,6 +58,7 @@ def plot(
     y_range: tuple[int, int] | None = None,
     figsize: tuple[int, int] | None = None,
     dpi: int = 300,
+    ax: plt.Axes | None = None,
 ) -> tuple[plt.Figure, plt.Axes]:
     """Plot Pianoroll
     Parameters
@@ -86,10 +98,17 @@ def plot(
         is too large.
     dpi : int
         Dots per inch.
+    ax : plt.Axes
+        axes to plot on, e.g. to reuse them over several plots. If None,
+        a new figure is created with figsize and dpi.
     """
 
-    # init the figure
-    if figsize is not None:
+    # init the figure, pyplot is only imported when plotting
+    from matplotlib import pyplot as plt
+
+    if ax is not None:
+        fig = ax.figure
+    elif figsize is not None:
         fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
     else:
         fig, ax = plt.subplots(dpi=dpi)
@@ -99,7 +118,9 @@ def plot(
     sz_time, sz_pitch = pianoroll.shape
     if (ed - st) != sz_pitch:
         raise ValueError("Invalid note_range")
-    pianoroll = pitch_padding(pianoroll, note_range)
+    if (st, ed) != (0, 128):
+        # a full pianoroll has nothing to pad, pitch_padding would only copy it
+        pianoroll = pitch_padding(pianoroll, note_range)
 
     # set display range
     if x_range is None:
@@ -107,25 +128,23 @@ def plot(
     if y_range is None:
         y_range = note_range
 
-    to_plot = pianoroll.T
-    canvas = np.ones_like(to_plot)
+    # (pitch, time) layout, contiguous for the element-wise passes over the notes.
+    # This is a view for pianorolls created by notes2pianoroll, already pitch-major
+    to_plot = np.ascontiguousarray(pianoroll.T)
 
-    # plot background
-    plot_background(ax, background_layout, canvas)
-
-    # plot notes
-    plot_note_entries(ax, to_plot)
+    # plot background and notes, composited in a single image
+    plot_pianoroll_image(ax, background_layout, to_plot)
 
     # plot and set ticks
     plot_xticks(ax, xtick, xtick_interval, sz_time, beat_resolution, downbeats)
-    plot_yticks(ax, ytick, ytick_interval, sz_time, beat_resolution, downbeats)
+    plot_yticks(ax, ytick, ytick_interval)
 
     # plot grid
     plot_grid(ax, grid_layout)
 
     # set range
-    plt.xlim(x_range)
-    plt.ylim(y_range)
+    ax.set_xlim(x_range)
+    ax.set_ylim(y_range)
 
     return fig, ax
 
@@ -140,6 +159,7 @@ def plot_chroma(
     xtick_interval: int = 1,
     figsize: tuple[int, int] | None = None,
     dpi: int = 300,
+    ax: plt.Axes | None = None,
 ) -> tuple[plt.Figure, plt.Axes]:
     """Plot Chromagram
     Parameters
@@ -167,16 +187,23 @@ def plot_chroma(
         is too large.
     dpi : int
         Dots per inch.
+    ax : plt.Axes
+        axes to plot on, e.g. to reuse them over several plots. If None,
+        a new figure is created with figsize and dpi.
     """
-    # init the figure
-    if figsize is not None:
+    # init the figure, pyplot is only imported when plotting
+    from matplotlib import pyplot as plt
+
+    if ax is not None:
+        fig = ax.figure
+    elif figsize is not None:
         fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
     else:
         fig, ax = plt.subplots(dpi=dpi)
 
     # chroma
     sz_time, sz_pitch = chroma.shape
-    to_plot = chroma.T
+    to_plot = np.ascontiguousarray(chroma.T)
     if sz_pitch != 12:
         raise ValueError("Invalid Input: the dim of pitch should be 12")
 
@@ -189,28 +216,26 @@ def plot_chroma(
 
     # plot yticks
     yticks = np.arange(0, 12)
-    ax.set_yticks(yticks)
+    ax.yaxis.set_major_locator(FixedLocator(yticks))
     if ytick == "number":
-        ax.set_yticklabels(yticks, fontsize=YLABEL_FONT_SIZE)
+        _set_tick_labels(ax.yaxis, np.char.mod("%d", yticks), YLABEL_FONT_SIZE)
     elif ytick == "note":
         yticks_name = [PITCH_ID_TO_NAME[k % 12] for k in yticks]
-        ax.set_yticklabels(yticks_name, fontsize=YLABEL_FONT_SIZE)
+        _set_tick_labels(ax.yaxis, yticks_name, YLABEL_FONT_SIZE)
     else:
         ax.tick_params(axis="y", width=0)
-        ax.set_yticklabels([])
+        _set_tick_labels(ax.yaxis, [])
 
     # display
     ax.imshow(
         to_plot,
         aspect="auto",
-        cmap=CHROMA_CMAP,
-        vmin=np.min(to_plot),
-        vmax=np.max(to_plot),
+        cmap=_get_cmap(CHROMA_CMAP),
         origin="lower",
         interpolation="none",
     )
     # set range
-    plt.xlim(x_range)
+    ax.set_xlim(x_range)
 
     return fig, ax
 
@@ -221,6 +246,7 @@ def plot_heatmap(
     origin: str = "upper",
     figsize: tuple[int, int] | None = None,
     dpi: int = 300,
+    ax: plt.Axes | None = None,
 ) -> tuple[plt.Figure, plt.Axes]:
     """Plot Similarity Matrix
     Parameters
@@ -238,20 +264,25 @@ def plot_heatmap(
         is too large.
     dpi : int
         Dots per inch.
+    ax : plt.Axes
+        axes to plot on, e.g. to reuse them over several plots. If None,
+        a new figure is created with figsize and dpi.
     """
 
-    # init the figure
-    if figsize is not None:
+    # init the figure, pyplot is only imported when plotting
+    from matplotlib import pyplot as plt
+
+    if ax is not None:
+        fig = ax.figure
+    elif figsize is not None:
         fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
     else:
         fig, ax = plt.subplots(dpi=dpi)
 
     # display
-    plt.imshow(
+    ax.imshow(
         to_plot,
-        cmap=SM_CMAP,
-        vmin=np.min(to_plot),
-        vmax=np.max(to_plot),
+        cmap=_get_cmap(SM_CMAP),
         origin=origin,
         interpolation="none",
     )
@@ -264,10 +295,12 @@ def plot_heatmap(
     xticks = np.arange(0, sx)
     yticks = np.arange(0, sy)
 
-    ax.set_xticks(xticks)
-    ax.set_xticklabels(xticks, fontsize=XLABEL_FONT_SIZE, rotation=-90)
-    ax.set_yticks(yticks)
-    ax.set_yticklabels(yticks, fontsize=XLABEL_FONT_SIZE)
+    ax.xaxis.set_major_locator(FixedLocator(xticks))
+    _set_tick_labels(
+        ax.xaxis, np.char.mod("%d", xticks), XLABEL_FONT_SIZE, rotation=-90
+    )
+    ax.yaxis.set_major_locator(FixedLocator(yticks))
+    _set_tick_labels(ax.yaxis, np.char.mod("%d", yticks), XLABEL_FONT_SIZE)
 
     ax.xaxis.set_tick_params(labeltop="on", top=True)  # show labs on top
     return fig, ax
@@ -295,35 +328,26 @@ def plot_grid(ax: plt.Axes, layout: str, which: str = "minor", color="k"):
         )
 
 
-def plot_yticks(
-    ax: plt.Axes, ytick: str, ytick_interval: int, max_tick, beat_resolution, downbeats
-):
+def plot_yticks(ax: plt.Axes, ytick: str, ytick_interval: int):
     # tick arrangement
     # - ytick, minor for grid
     yticks = np.arange(0.5, 128.5)
-    ax.set_yticks(yticks, minor=True)
+    ax.yaxis.set_minor_locator(FixedLocator(yticks))
     ax.tick_params(axis="y", which="minor", width=0)
 
     # - yticks & labels
     yticks_key = np.arange(0, 128, ytick_interval)
-    ax.set_yticks(yticks_key)
+    ax.yaxis.set_major_locator(FixedLocator(yticks_key))
 
     if ytick == "number":
-        ax.set_yticklabels(yticks_key, fontsize=YLABEL_FONT_SIZE)
+        _set_tick_labels(ax.yaxis, np.char.mod("%d", yticks_key), YLABEL_FONT_SIZE)
     elif ytick == "note":
-        yticks_name = []
-        for k in yticks_key:
-            lab = ""
-            if k % 12 in PITCH_ID_TO_NAME:
-                lab = "%2s%s" % (
-                    str(PITCH_ID_TO_NAME[k % 12]),
-                    str(k // 12 + OFFSET_OCTAVE),
-                )
-            yticks_name.append(lab)
-        ax.set_yticklabels(yticks_name, fontsize=YLABEL_FONT_SIZE)
+        pitch_labels = _pitch_labels(OFFSET_OCTAVE)
+        yticks_name = [pitch_labels[k] for k in yticks_key]
+        _set_tick_labels(ax.yaxis, yticks_name, YLABEL_FONT_SIZE)
     else:
         ax.tick_params(axis="y", which="major", width=0)
-        ax.set_yticklabels([])
+        _set_tick_labels(ax.yaxis, [])
 
 
 def plot_xticks(
@@ -337,7 +361,7 @@ def plot_xticks(
     # tick arrangement
     # - xtick, minor for beat
     xticks_beat = np.arange(0, max_tick, beat_resolution)
-    ax.set_xticks(xticks_beat, minor=True)
+    ax.xaxis.set_minor_locator(FixedLocator(xticks_beat))
 
     # - downbeats
     xticks_downbeats = None
@@ -346,65 +370,62 @@ def plot_xticks(
         if isinstance(downbeats, int):
             xticks_downbeats = np.arange(0, max_tick, beat_resolution * downbeats)
         else:
-            downbeats = np.array(downbeats)
-            if downbeats.dtype == int:
+            downbeats = np.asarray(downbeats)
+            if downbeats.dtype == bool:
+                xticks_downbeats = np.flatnonzero(downbeats)
+            elif np.issubdtype(downbeats.dtype, np.integer):
                 xticks_downbeats = downbeats
-            elif downbeats.dtype == bool:
-                xticks_downbeats = np.where(downbeats == True)  # noqa: E712
             else:
                 raise ValueError(f"Unkown downbeats type: {downbeats}")
-        ax.set_xticks(xticks_downbeats)
+        ax.xaxis.set_major_locator(FixedLocator(xticks_downbeats))
         ax.grid(
             axis="x", color="k", which="major", linestyle="-", linewidth=0.5, alpha=1.0
         )
     else:
         ax.tick_params(axis="x", which="major", width=0)
-    ax.set_xticklabels([])
+    _set_tick_labels(ax.xaxis, [])
 
     # - xticks & labels
     if xtick == "beat":
-        xlabels_beat = np.array([str(tick // beat_resolution) for tick in xticks_beat])
+        xlabels_beat = np.char.mod("%d", xticks_beat // beat_resolution)
         xlabels_beat = _label_selector(xlabels_beat, xtick_interval)
-        ax.set_xticklabels(
-            xlabels_beat, minor=True, fontsize=XLABEL_FONT_SIZE, rotation=-90
+        _set_tick_labels(
+            ax.xaxis, xlabels_beat, XLABEL_FONT_SIZE, rotation=-90, minor=True
         )
     elif xtick == "tick":
-        xlabels_tick = np.array([str(tick) for tick in xticks_beat])
+        xlabels_tick = np.char.mod("%d", xticks_beat)
         xlabels_tick = _label_selector(xlabels_tick, xtick_interval)
-        ax.set_xticklabels(
-            xlabels_tick, minor=True, fontsize=XLABEL_FONT_SIZE, rotation=-90
+        _set_tick_labels(
+            ax.xaxis, xlabels_tick, XLABEL_FONT_SIZE, rotation=-90, minor=True
         )
     elif xtick == "downbeat":
         if xtick == "downbeat" and downbeats is None:
             raise ValueError("Invalid Input: downbeats is None!")
-        xlabels_dwonbeats = np.array([str(idx) for idx in range(len(xticks_downbeats))])
+        xlabels_dwonbeats = np.char.mod("%d", np.arange(len(xticks_downbeats)))
         xlabels_dwonbeats = _label_selector(xlabels_dwonbeats, xtick_interval)
-        ax.set_xticklabels(xlabels_dwonbeats, fontsize=XLABEL_FONT_SIZE, rotation=-90)
+        _set_tick_labels(ax.xaxis, xlabels_dwonbeats, XLABEL_FONT_SIZE, rotation=-90)
     elif xtick is None:
-        ax.set_xticklabels([])
+        _set_tick_labels(ax.xaxis, [])
         ax.tick_params(axis="x", which="minor", width=0)
         ax.tick_params(axis="x", which="major", width=0)
     else:
         raise ValueError(f"Unkown xtick type: {xtick}")
 
 
-def plot_background(ax: plt.Axes, layout: str, canvas):
+def plot_background(ax: plt.Axes, layout: str, shape: tuple[int, int]):
     if layout == "pianoroll":
-        all_black_index = []
-        for n in range(11):
-            all_black_index.extend(list(map(lambda x: x + 12 * n, [1, 3, 6, 8, 10])))
-
-        pianoroll_bg = np.ones_like(canvas) * WHITE_KEY_SATUR
-        pianoroll_bg[all_black_index[:-2]] = BLACK_KEY_SATUR
-
+        # the background is constant in time: a single column is stretched over the
+        # time steps
+        num_pitches, num_ticks = shape
         ax.imshow(
-            pianoroll_bg,
+            _background_column(num_pitches),
             aspect="auto",
-            cmap=PR_CMAP,
+            cmap=_get_cmap(PR_CMAP),
             vmin=0,
-            vmax=1,
+            vmax=255,
             origin="lower",
             interpolation="none",
+            extent=(-0.5, num_ticks - 0.5, -0.5, num_pitches - 0.5),
         )
     elif layout == "blank":
         pass
@@ -414,13 +435,15 @@ def plot_background(ax: plt.Axes, layout: str, canvas):
 
 def plot_note_entries(ax: plt.Axes, to_plot):
     # for better color percetion
-    color_shift = 80
+    color_shift = NOTE_COLOR_SHIFT
 
-    # plotting
-    masked_data = np.ma.masked_where(to_plot <= 0, to_plot + color_shift)
+    # plotting, the entries without notes are NaN and drawn transparent. The shift is
+    # computed in float32 so that int8 velocities do not overflow
+    notes_data = np.full(to_plot.shape, np.nan, dtype=np.float32)
+    np.add(to_plot, color_shift, out=notes_data, where=to_plot > 0, dtype=np.float32)
     ax.imshow(
-        masked_data,
-        cmap=NOTE_CMAP,
+        notes_data,
+        cmap=_get_cmap(NOTE_CMAP, transparent_bad=True),
         aspect="auto",
         vmin=0,
         vmax=127 + color_shift,
@@ -429,9 +452,89 @@ def plot_note_entries(ax: plt.Axes, to_plot):
     )
 
 
+def plot_pianoroll_image(ax: plt.Axes, layout: str, to_plot):
+    # draws the background and the notes as a single RGBA image, as drawn by
+    # plot_background and plot_note_entries, with one artist instead of two
+    if layout == "pianoroll":
+        background = _background_column(to_plot.shape[0])[:, 0] / 255
+        background = _get_cmap(PR_CMAP)(background, bytes=True)
+    elif layout == "blank":
+        background = np.zeros((to_plot.shape[0], 4), dtype=np.uint8)
+    else:
+        raise ValueError(f"Unkown background layout: {layout}")
+
+    image = np.empty((*to_plot.shape, 4), dtype=np.uint8)
+    image[:] = background[:, None]
+    notes = to_plot > 0
+    # shifted in float32 so that int8 velocities do not overflow
+    shifted = np.add(to_plot[notes], NOTE_COLOR_SHIFT, dtype=np.float32)
+    image[notes] = _get_cmap(NOTE_CMAP)(shifted / (127 + NOTE_COLOR_SHIFT), bytes=True)
+    ax.imshow(image, aspect="auto", origin="lower", interpolation="none")
+
+
+def _background_column(num_pitches: int) -> np.ndarray:
+    # saturations of the white and black keys, scaled to uint8, as a (pitch, 1) column
+    column = np.full((num_pitches, 1), round(WHITE_KEY_SATUR * 255), dtype=np.uint8)
+    column[BLACK_KEY_IDX] = round(BLACK_KEY_SATUR * 255)
+    return column
+
+
+def _set_tick_labels(
+    axis,
+    labels,
+    fontsize: float | None = None,
+    rotation: float = 0,
+    minor: bool = False,
+):
+    # sets the labels of fixed ticks and their text properties, which are applied
+    # to the tick artists when they are created at draw time, unlike set_ticklabels
+    # that creates them immediately
+    if len(labels) == 0:
+        formatter = NullFormatter()
+    else:
+        # labels are matched by location as minor ticks at the location of a major
+        # one are not drawn, which would shift labels matched by position
+        locator = axis.get_minor_locator() if minor else axis.get_major_locator()
+        tick_labels = dict(zip(locator.locs, labels, strict=False))
+        formatter = FuncFormatter(lambda x, pos: tick_labels.get(x, ""))
+    if minor:
+        axis.set_minor_formatter(formatter)
+    else:
+        axis.set_major_formatter(formatter)
+    if fontsize is not None:
+        axis.set_tick_params(
+            which="minor" if minor else "major",
+            labelsize=fontsize,
+            labelrotation=rotation,
+        )
+
+
+def _get_cmap(cmap: str | Colormap, transparent_bad: bool = False) -> Colormap:
+    if isinstance(cmap, str):
+        return _get_named_cmap(cmap, transparent_bad)
+    return cmap.with_extremes(bad=(0, 0, 0, 0)) if transparent_bad else cmap
+
+
+@lru_cache
+def _get_named_cmap(name: str, transparent_bad: bool) -> Colormap:
+    # colormaps are resolved once per name, instead of being looked up and copied
+    # from the registry by every imshow call
+    cmap = colormaps[name]
+    return cmap.with_extremes(bad=(0, 0, 0, 0)) if transparent_bad else cmap
+
+
+@lru_cache
+def _pitch_labels(offset_octave: int) -> tuple[str, ...]:
+    # names of the 128 pitches, formatted once per octave offset
+    return tuple(
+        f"{PITCH_ID_TO_NAME[k % 12]:>2}{k // 12 + offset_octave}" for k in range(128)
+    )
+
+
 def _label_selector(labels, skip):
     if skip > 1:
-        for idx in range(len(labels)):
-            if idx % skip:
-                labels[idx] = ""
+        # keeps one label every skip with slices, without building an index array
+        kept = labels[::skip].copy()
+        labels[:] = ""
+        labels[::skip] = kept
     return labels
@@ -1,18 +1,26 @@
+import pickle
+
 import pytest
 
+from miditoolkit import MidiFile
 
-@pytest.fixture()
-def disable_mido_checks(monkeypatch):
+
+@pytest.fixture(scope="session")
+def disable_mido_checks():
     """
     Disable internal checks in `mido`, for performance.
+
+    They are disabled once for the whole session, as no test relies on them.
     """
     from mido.messages import messages
 
-    monkeypatch.setattr(messages, "check_msgdict", lambda d: d)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(messages, "check_msgdict", lambda d: d)
+        yield
 
 
-@pytest.fixture()
-def disable_mido_merge_tracks(monkeypatch):
+@pytest.fixture(scope="session")
+def disable_mido_merge_tracks():
     """
     Disallow `mido` from creating `merged_tracks` when files are loaded.
 
@@ -24,4 +32,42 @@ def disable_mido_merge_tracks(monkeypatch):
     """
     from mido.midifiles import midifiles
 
-    monkeypatch.setattr(midifiles, "merge_tracks", lambda tracks: None)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(midifiles, "merge_tracks", lambda tracks: None)
+        yield
+
+
+@pytest.fixture(scope="session")
+def _midi_cache():
+    """
+    MIDIs loaded during the session, by file path.
+    """
+    return {}
+
+
+def _cached_midi(path, cache):
+    if path not in cache:
+        cache[path] = MidiFile(path)
+    return cache[path]
+
+
+@pytest.fixture()
+def shared_midi(request, _midi_cache, disable_mido_checks, disable_mido_merge_tracks):
+    """
+    The MIDI loaded from the file path given by (indirect) parametrization.
+
+    Each file is only parsed once per session, and the same object is shared by all
+    the tests using it, which must hence not modify it.
+    """
+    return _cached_midi(request.param, _midi_cache)
+
+
+@pytest.fixture()
+def midi(request, _midi_cache, disable_mido_checks, disable_mido_merge_tracks):
+    """
+    A copy of the shared MIDI given by (indirect) parametrization, that the test
+    can modify. The copy is pickled then unpickled, which is faster than deepcopy.
+    """
+    return pickle.loads(
+        pickle.dumps(_cached_midi(request.param, _midi_cache), pickle.HIGHEST_PROTOCOL)
+    )
@@ -1,12 +1,19 @@
 #!/usr/bin/python3 python
-from operator import attrgetter
+from copy import deepcopy
 
+import numpy as np
 import pytest
 
-from miditoolkit import MidiFile
+from miditoolkit import MidiFile, Note
 from miditoolkit.constants import PITCH_RANGE
-from miditoolkit.pianoroll import notes2pianoroll, pianoroll2notes
-from tests.utils import MIDI_PATHS
+from miditoolkit.pianoroll import (
+    notes2pianoroll,
+    notes2pianoroll_batch,
+    parser,
+    pianoroll2notes,
+)
+from miditoolkit.pianoroll.utils import normalize, tochroma
+from tests.utils import MIDI_IDS, MIDI_IDS_SMALL, MIDI_PATHS, MIDI_PATHS_SMALL
 
 test_sets = [
     {"pitch_range": (0, 127)},
@@ -17,9 +24,21 @@ test_sets = [
 ]
 
 
-@pytest.mark.parametrize("midi_path", MIDI_PATHS, ids=attrgetter("name"))
+@pytest.fixture(params=["numba", "numpy"])
+def paint_backend(request, monkeypatch):
+    """
+    Paints the dense pianorolls with the numba kernel, then with the numpy fallback.
+    """
+    if request.param == "numba":
+        pytest.importorskip("numba")
+    else:
+        monkeypatch.setattr(parser, "_paint_notes_kernel", lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize("shared_midi", MIDI_PATHS, ids=MIDI_IDS, indirect=True)
 @pytest.mark.parametrize("test_set", test_sets)
-def test_pianoroll(midi_path, test_set, disable_mido_checks, disable_mido_merge_tracks):
+def test_pianoroll(shared_midi, test_set, paint_backend):
     """Testing creating pianorolls of notes."""
 
     # Set pitch range parameters
@@ -30,9 +49,7 @@ def test_pianoroll(midi_path, test_set, disable_mido_checks, disable_mido_merge_
             min(PITCH_RANGE[1], pitch_range[1] + test_set["pitch_offset"]),
         )
 
-    midi = MidiFile(midi_path)
-
-    for track in midi.instruments:
+    for track in shared_midi.instruments:
         # We do a first notes -> pianoroll -> notes conversion before
         # This step is required as the pianoroll conversion is lossy with overlapping notes.
         # notes2pianoroll has a "last income priority" logic, for which if a notes is occurs
@@ -62,3 +79,113 @@ def test_pianoroll(midi_path, test_set, disable_mido_checks, disable_mido_merge_
             assert (
                 note1 == note2
             ), "Notes before and after pianoroll conversion are not the same"
+
+
+@pytest.mark.parametrize("midi", MIDI_PATHS_SMALL, ids=MIDI_IDS_SMALL, indirect=True)
+def test_notes2pianoroll_keeps_notes(midi):
+    """Testing that creating pianorolls does not modify the notes."""
+    for track in midi.instruments:
+        notes = deepcopy(track.notes)
+        notes2pianoroll(
+            track.notes,
+            pitch_range=(24, 96),
+            resample_factor=0.5,
+            time_portion=(100, 2000),
+        )
+        assert track.notes == notes, "The notes were modified by notes2pianoroll"
+
+
+@pytest.mark.parametrize(
+    "shared_midi", MIDI_PATHS_SMALL, ids=MIDI_IDS_SMALL, indirect=True
+)
+@pytest.mark.parametrize("test_set", test_sets)
+def test_notes2pianoroll_sparse(shared_midi, test_set, paint_backend):
+    """Testing that sparse pianorolls are identical to dense ones."""
+    pytest.importorskip("scipy")
+    for track in shared_midi.instruments:
+        if len(track.notes) == 0:
+            continue
+        pianoroll = notes2pianoroll(track.notes, **test_set)
+        sparse_pianoroll = notes2pianoroll(track.notes, sparse=True, **test_set)
+        assert sparse_pianoroll.shape == pianoroll.shape
+        assert np.array_equal(sparse_pianoroll.toarray(), pianoroll)
+
+
+@pytest.mark.parametrize("pitch_offset", [0, 3])
+def test_notes2pianoroll_auto_pitch_range(pitch_offset):
+    """Testing that pianorolls are cropped to the pitches played without range."""
+    notes = [Note(60, 40, 0, 10), Note(80, 72, 5, 20)]
+    pianoroll = notes2pianoroll(notes, pitch_offset=pitch_offset)
+    assert pianoroll.shape == (20, 72 - 40 + 1 + 2 * pitch_offset)
+    assert np.flatnonzero(pianoroll.any(axis=0)).tolist() == [
+        pitch_offset,
+        72 - 40 + pitch_offset,
+    ]
+
+    # Nothing is played within the time portion, the pianoroll is not cropped
+    pianoroll = notes2pianoroll(notes, pitch_offset=pitch_offset, time_portion=(30, 40))
+    assert pianoroll.shape == (10, 128)
+
+
+@pytest.mark.parametrize("pitch", [-1, 128, 140])
+def test_notes2pianoroll_invalid_pitch(pitch):
+    """Testing that notes with pitches out of the pianoroll raise an error."""
+    notes = [Note(80, 60, 0, 10), Note(80, pitch, 0, 10)]
+    with pytest.raises(IndexError):
+        notes2pianoroll(notes)
+
+
+@pytest.mark.parametrize("n_jobs", [2, -1])
+def test_notes2pianoroll_batch(n_jobs, disable_mido_checks, disable_mido_merge_tracks):
+    """Testing that pianorolls converted in parallel are the same as in-process."""
+    notes_batch = [
+        track.notes
+        for midi_path in MIDI_PATHS[:3]
+        for track in MidiFile(midi_path).instruments
+        if len(track.notes) > 0
+    ]
+    test_set = {"pitch_range": (24, 96), "resample_factor": 0.5}
+
+    # Converting in-process first, the worker processes must still work when forked
+    # after the numba kernel (if installed) has run
+    expected = [notes2pianoroll(notes, **test_set) for notes in notes_batch]
+    pianorolls = notes2pianoroll_batch(notes_batch, n_jobs=n_jobs, **test_set)
+    assert len(pianorolls) == len(notes_batch)
+    for pianoroll, expected_pianoroll in zip(pianorolls, expected, strict=False):
+        assert np.array_equal(pianoroll, expected_pianoroll)
+
+
+@pytest.mark.parametrize("num_pitches", [12, 88, 128])
+def test_tochroma(num_pitches):
+    """Testing that the chroma sums the octaves of each pitch class."""
+    pianoroll = np.random.randint(0, 128, (50, num_pitches)).astype(np.int8)
+    chroma = tochroma(pianoroll)
+
+    assert chroma.shape == (50, 12)
+    for pitch_class in range(12):
+        assert np.array_equal(
+            chroma[:, pitch_class], pianoroll[:, pitch_class::12].sum(axis=1)
+        )
+
+
+@pytest.mark.parametrize(
+    "dtype, expected_dtype",
+    [
+        (np.int8, np.float32),
+        (np.int64, np.float64),
+        (np.float32, np.float32),
+        (np.float64, np.float64),
+    ],
+)
+def test_normalize(dtype, expected_dtype):
+    """Testing that tensors are normalized between 0 and 1."""
+    tensor = np.array([[-100, 0], [50, 100]], dtype=dtype)  # spans more than int8
+    normalized = normalize(tensor)
+
+    assert normalized.dtype == expected_dtype
+    np.testing.assert_allclose(normalized, [[0, 0.5], [0.75, 1]])
+
+    # Constant tensors are normalized to zeros
+    normalized = normalize(np.full((3, 4), 7, dtype=dtype))
+    assert normalized.dtype == expected_dtype
+    assert np.array_equal(normalized, np.zeros((3, 4)))
@@ -1,26 +1,62 @@
-from operator import attrgetter
-
+import numpy as np
 import pytest
 
-from miditoolkit import MidiFile, Note
-from tests.utils import MIDI_PATHS
+from miditoolkit import Instrument, MidiFile, Note, TempoChange
+from tests.utils import (
+    MIDI_IDS,
+    MIDI_IDS_SMALL,
+    MIDI_PATHS,
+    MIDI_PATHS_SMALL,
+    count_notes_with_duration,
+)
 
 
-@pytest.mark.parametrize("midi_path", MIDI_PATHS[:5], ids=attrgetter("name"))
-def test_remove_notes_with_no_duration(
-    midi_path, tmp_path, disable_mido_checks, disable_mido_merge_tracks
-):
+@pytest.mark.parametrize(
+    "shared_midi", MIDI_PATHS_SMALL, ids=MIDI_IDS_SMALL, indirect=True
+)
+def test_remove_notes_with_no_duration(shared_midi):
     """Test that a MIDI loaded and saved unchanged is indeed the save as before."""
-    # Load the MIDI file and removes the notes with durations <= 0
-    midi = MidiFile(midi_path)
-    midi.instruments[0].remove_notes_with_no_duration()
-    num_notes_before = midi.instruments[0].num_notes
+    # Only the notes of the first track are modified, on a copy of the shared MIDI's
+    track = shared_midi.instruments[0]
+    track = Instrument(track.program, track.is_drum, track.name, list(track.notes))
+
+    # Counts the notes with durations > 0, that should be kept
+    num_notes_before = count_notes_with_duration(track.notes)
 
-    # Adding notes with durations <= 0, then reapply the method
-    midi.instruments[0].notes.append(Note(50, 50, 100, 100))
-    midi.instruments[0].notes.append(Note(50, 50, 101, 100))
-    midi.instruments[0].remove_notes_with_no_duration()
+    # Adding notes with durations <= 0, then apply the method
+    track.notes.append(Note(50, 50, 100, 100))
+    track.notes.append(Note(50, 50, 101, 100))
+    track.remove_notes_with_no_duration()
 
     assert (
-        midi.instruments[0].num_notes == num_notes_before
+        track.num_notes == num_notes_before
     ), "The notes with duration <=0 were not removed by test_remove_notes_with_no_duration"
+
+
+@pytest.mark.parametrize("shared_midi", MIDI_PATHS, ids=MIDI_IDS, indirect=True)
+def test_tick_to_time(shared_midi):
+    """Test that the ticks converted to seconds match the tick to time mapping."""
+    tick_to_time = shared_midi.get_tick_to_time_mapping()
+    ticks = np.arange(shared_midi.max_tick + 1)
+
+    np.testing.assert_allclose(shared_midi.tick_to_time(ticks), tick_to_time)
+    assert shared_midi.tick_to_time(shared_midi.max_tick) == pytest.approx(
+        tick_to_time[-1]
+    )
+
+
+def test_tick_to_time_unsorted_tempos():
+    """Test that the tempo changes do not need to be sorted to convert ticks."""
+    midi = MidiFile()
+    midi.max_tick = 3000
+    midi.tempo_changes = [
+        TempoChange(120, 0),
+        TempoChange(60, 2000),
+        TempoChange(240, 1000),
+    ]
+    ticks = np.arange(midi.max_tick + 1)
+    seconds = midi.tick_to_time(ticks)
+
+    midi.tempo_changes.sort(key=lambda tempo: tempo.time)
+    np.testing.assert_allclose(seconds, midi.get_tick_to_time_mapping())
+    assert np.all(np.diff(seconds) > 0)
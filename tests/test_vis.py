@@ -0,0 +1,195 @@
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from miditoolkit.pianoroll import vis
+
+plt.switch_backend("Agg")
+
+BEAT_RESOLUTION = 24
+NUM_TICKS = 8 * BEAT_RESOLUTION
+
+
+@pytest.fixture(autouse=True)
+def _close_figures():
+    yield
+    plt.close("all")
+
+
+@pytest.fixture()
+def pianoroll():
+    rng = np.random.default_rng(0)
+    pianoroll = np.zeros((NUM_TICKS, 128), dtype=np.int8)
+    ticks = rng.integers(0, NUM_TICKS, 300)
+    pitches = rng.integers(30, 90, 300)
+    pianoroll[ticks, pitches] = rng.integers(1, 128, 300)
+    return pianoroll
+
+
+def _render(fig) -> np.ndarray:
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+def _tick_labels(axis, minor=False) -> dict[float, str]:
+    # labels of the drawn ticks, by location
+    axis.figure.canvas.draw()
+    return {
+        float(tick.get_loc()): tick.label1.get_text()
+        for tick in (axis.get_minor_ticks() if minor else axis.get_major_ticks())
+    }
+
+
+@pytest.mark.parametrize("xtick", ["downbeat", "beat", "tick", None])
+@pytest.mark.parametrize("ytick", ["number", "note", None])
+def test_plot(pianoroll, xtick, ytick):
+    """Testing plotting pianorolls with each kind of ticks."""
+    fig, ax = vis.plot(
+        pianoroll, beat_resolution=BEAT_RESOLUTION, xtick=xtick, ytick=ytick, dpi=50
+    )
+    _render(fig)
+    assert ax.get_xlim() == (0, NUM_TICKS)
+    assert ax.get_ylim() == (0, 128)
+
+
+def test_plot_downbeats(pianoroll):
+    """Testing that downbeats given as a mask or as indices are plotted the same."""
+    downbeats = np.zeros(NUM_TICKS, dtype=bool)
+    downbeats[::60] = True
+    plots = [
+        vis.plot(
+            pianoroll, beat_resolution=BEAT_RESOLUTION, downbeats=downbeats_, dpi=50
+        )
+        for downbeats_ in (downbeats, np.flatnonzero(downbeats))
+    ]
+    locs, labels = [], []
+    for fig, ax in plots:
+        _render(fig)
+        locs.append(ax.get_xticks().tolist())
+        labels.append([label.get_text() for label in ax.get_xticklabels()])
+    assert locs[0] == locs[1] == np.flatnonzero(downbeats).tolist()
+    assert labels[0] == labels[1]
+
+
+def test_plot_ax(pianoroll):
+    """Testing plotting pianorolls on existing axes."""
+    fig, ax = plt.subplots(dpi=50)
+    fig_, ax_ = vis.plot(pianoroll, background_layout="blank", ax=ax)
+    assert fig_ is fig and ax_ is ax
+    assert len(ax.images) == 1
+    _render(fig)
+
+
+@pytest.mark.parametrize("background_layout", ["pianoroll", "blank"])
+def test_plot_pianoroll_image(pianoroll, background_layout):
+    """Testing that the composite image is drawn as the background and notes layers."""
+    to_plot = np.ascontiguousarray(pianoroll.T)
+    images = []
+    for composite in (True, False):
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+        ax.set_position((0, 0, 1, 1))
+        ax.set_axis_off()
+        if composite:
+            vis.plot_pianoroll_image(ax, background_layout, to_plot)
+        else:
+            vis.plot_background(ax, background_layout, to_plot.shape)
+            vis.plot_note_entries(ax, to_plot)
+        ax.set_xlim(0, NUM_TICKS)
+        ax.set_ylim(0, 128)
+        images.append(_render(fig).copy())
+    assert np.array_equal(images[0], images[1])
+
+
+def test_plot_xtick_labels(pianoroll):
+    """Testing the labels of the time axis."""
+    # beats, one label every two beats, the ones at downbeats (0 and 4) are not drawn
+    _, ax = vis.plot(pianoroll, xtick="beat", xtick_interval=2, dpi=50)
+    assert _tick_labels(ax.xaxis, minor=True) == {
+        24: "",
+        48: "2",
+        72: "",
+        120: "",
+        144: "6",
+        168: "",
+    }
+
+    # ticks of the beats
+    _, ax = vis.plot(pianoroll, xtick="tick", dpi=50)
+    assert _tick_labels(ax.xaxis, minor=True) == {
+        24: "24",
+        48: "48",
+        72: "72",
+        120: "120",
+        144: "144",
+        168: "168",
+    }
+
+    # downbeats every two beats, one label every two downbeats
+    _, ax = vis.plot(pianoroll, downbeats=2, xtick_interval=2, dpi=50)
+    assert _tick_labels(ax.xaxis) == {0: "0", 48: "", 96: "2", 144: ""}
+
+    _, ax = vis.plot(pianoroll, xtick=None, dpi=50)
+    assert set(_tick_labels(ax.xaxis).values()) == {""}
+    assert set(_tick_labels(ax.xaxis, minor=True).values()) == {""}
+
+
+def test_plot_ytick_labels(pianoroll):
+    """Testing the labels of the pitch axis."""
+    _, ax = vis.plot(pianoroll, ytick="number", ytick_interval=24, dpi=50)
+    assert _tick_labels(ax.yaxis) == {
+        0: "0",
+        24: "24",
+        48: "48",
+        72: "72",
+        96: "96",
+        120: "120",
+    }
+
+    _, ax = vis.plot(pianoroll, ytick="note", ytick_interval=24, dpi=50)
+    assert _tick_labels(ax.yaxis) == {
+        0: " C-1",
+        24: " C1",
+        48: " C3",
+        72: " C5",
+        96: " C7",
+        120: " C9",
+    }
+
+    _, ax = vis.plot(pianoroll, ytick=None, dpi=50)
+    assert set(_tick_labels(ax.yaxis).values()) == {""}
+
+
+@pytest.mark.parametrize("ytick", ["number", "note", None])
+def test_plot_chroma(ytick):
+    """Testing plotting chromagrams."""
+    chroma = np.random.default_rng(0).random((NUM_TICKS, 12))
+    fig, ax = vis.plot_chroma(
+        chroma, beat_resolution=BEAT_RESOLUTION, ytick=ytick, dpi=50
+    )
+    _render(fig)
+    assert ax.get_xlim() == (0, NUM_TICKS)
+    if ytick == "note":
+        assert list(_tick_labels(ax.yaxis).values()) == [
+            "C",
+            "C#",
+            "D",
+            "D#",
+            "E",
+            "F",
+            "F#",
+            "G",
+            "G#",
+            "A",
+            "A#",
+            "B",
+        ]
+
+
+def test_plot_heatmap():
+    """Testing plotting similarity matrices."""
+    heatmap = np.random.default_rng(0).random((30, 30))
+    fig, ax = vis.plot_heatmap(heatmap, dpi=50)
+    _render(fig)
+    expected_labels = {tick: str(tick) for tick in range(30)}
+    assert _tick_labels(ax.xaxis) == expected_labels
+    assert _tick_labels(ax.yaxis) == expected_labels
@@ -1,5 +1,19 @@
+from collections.abc import Sequence
 from pathlib import Path
 
+import numpy as np
+
+from miditoolkit import Note
+
 HERE = Path(__file__).parent
 
-MIDI_PATHS = sorted((HERE / "testcases").rglob("*.mid"))
+MIDI_PATHS = tuple(sorted((HERE / "testcases").rglob("*.mid")))
+MIDI_IDS = tuple(path.name for path in MIDI_PATHS)
+MIDI_PATHS_SMALL, MIDI_IDS_SMALL = MIDI_PATHS[:5], MIDI_IDS[:5]
+
+
+def count_notes_with_duration(notes: Sequence[Note]) -> int:
+    """Counts the notes whose end time is after their start time."""
+    starts = np.fromiter((note.start for note in notes), np.int64, len(notes))
+    ends = np.fromiter((note.end for note in notes), np.int64, len(notes))
+    return int(np.count_nonzero(ends > starts))